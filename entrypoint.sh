@@ -13,4 +13,4 @@ export PYTHONUNBUFFERED=1
 cd /app
 
 # Run the HTTP server
-exec python http_server.py "$@"
+exec gunicorn http_server:app --config gunicorn.conf.py "$@"
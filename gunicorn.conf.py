@@ -0,0 +1,60 @@
+"""
+Gunicorn settings for the TradingAgents HTTP server.
+
+Usage:
+    gunicorn http_server:app --config gunicorn.conf.py
+
+Set WEB_CONCURRENCY to change the number of worker processes (more than
+one requires REDIS_URL), and PROMETHEUS_MULTIPROC_DIR to aggregate /metrics
+across them.
+"""
+
+import multiprocessing
+import os
+import shutil
+
+from dotenv import load_dotenv
+
+# Read REDIS_URL and WEB_CONCURRENCY from .env, as the app does
+load_dotenv()
+
+bind = os.getenv("BIND", "0.0.0.0:11360")
+
+# Without REDIS_URL the response cache, batch jobs and rate limit counters
+# live in each worker's memory, so a job created by one worker would not be
+# found by another. Run a single worker then, and refuse to start more.
+if os.getenv("REDIS_URL"):
+    workers = int(os.getenv("WEB_CONCURRENCY", 2 * multiprocessing.cpu_count() + 1))
+else:
+    workers = int(os.getenv("WEB_CONCURRENCY", 1))
+    if workers > 1:
+        raise RuntimeError(
+            f"WEB_CONCURRENCY={workers} needs REDIS_URL so workers share the "
+            "cache, batch jobs and rate limits; set REDIS_URL or use 1 worker"
+        )
+worker_class = "uvicorn_worker.UvicornWorker"
+
+# A full multi-agent analysis can take minutes
+timeout = 300
+graceful_timeout = 30
+
+# Import the app once in the master so workers share its pages copy-on-write.
+# The trading graph, LLM clients and Redis connection are still created per
+# worker in the app's lifespan, after the fork.
+preload_app = True
+
+# Prometheus multiprocess mode keeps per-worker metric files here; start from
+# an empty directory so counts from a previous run are not carried over.
+# This runs when the config is loaded, before the app is imported.
+prometheus_multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+if prometheus_multiproc_dir:
+    shutil.rmtree(prometheus_multiproc_dir, ignore_errors=True)
+    os.makedirs(prometheus_multiproc_dir)
+
+
+def child_exit(server, worker):
+    """Drop a dead worker's live gauges from the multiprocess metrics."""
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
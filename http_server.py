@@ -7,13 +7,40 @@ class to provide REST API endpoints for trading analysis.
 
 import os
 import json
-from datetime import date
-from typing import Dict, Any, Optional
+import math
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+import orjson
+import datetime
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from io import StringIO
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, List, Optional, Tuple, Union
 
-from fastapi import FastAPI, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from cachetools import TTLCache
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends import Backend
+from fastapi_cache.backends.redis import RedisBackend
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from limits import parse as parse_rate_limit
+from limits.storage import storage_from_string
+from limits.aio.strategies import MovingWindowRateLimiter
+from prometheus_client import Counter, Gauge, Histogram
+from prometheus_fastapi_instrumentator import Instrumentator
 from pydantic import BaseModel, Field
+from redis import asyncio as aioredis
+import pandas as pd
 
+from tradingagents.agents.utils.agent_utils import get_stock_data
+from tradingagents.dataflows.config import set_config
 from tradingagents.graph.trading_graph import TradingAgentsGraph
 from tradingagents.default_config import DEFAULT_CONFIG
 from dotenv import load_dotenv
@@ -21,11 +48,20 @@ from dotenv import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+logging.basicConfig(level=os.getenv("LOG_LEVEL", "INFO"))
+logger = logging.getLogger(__name__)
+
 # Create a custom config
 config = DEFAULT_CONFIG.copy()
 config["deep_think_llm"] = "gpt-4o-mini"
 config["quick_think_llm"] = "gpt-4o-mini"
 config["max_debate_rounds"] = 1
+config["enable_prompt_caching"] = True
+if os.getenv("OPENAI_TPM"):
+    # OPENAI_TPM is the account-wide quota, so all workers share one budget
+    # in Redis; without Redis there is only one worker (see gunicorn.conf.py)
+    config["llm_tokens_per_minute"] = int(os.getenv("OPENAI_TPM"))
+    config["llm_rate_limit_redis_url"] = os.getenv("REDIS_URL")
 config["data_vendors"] = {
     "core_stock_apis": "yfinance",
     "technical_indicators": "yfinance",
@@ -33,17 +69,356 @@ config["data_vendors"] = {
     "news_data": "alpha_vantage",
 }
 
-# Initialize the TradingAgentsGraph
-# Note: The graph will be initialized on first request to avoid blocking startup
-trading_graph_instance: Optional[TradingAgentsGraph] = None
+# Apply the config to the data tools once; /api/stock calls them directly
+set_config(config)
+
+
+# Prometheus metrics, exposed at /metrics. Under Gunicorn, set
+# PROMETHEUS_MULTIPROC_DIR so the values are aggregated across workers.
+decision_cache_hit_total = Counter(
+    "decision_cache_hit", "Decisions served from the response cache"
+)
+decision_cache_miss_total = Counter(
+    "decision_cache_miss", "Decisions that had to run the trading graph"
+)
+propagate_seconds = Histogram(
+    "propagate_seconds",
+    "Duration of one full trading graph run",
+    buckets=(5, 10, 30, 60, 120, 180, 300, 600),
+)
+decision_coalesced_total = Counter(
+    "decision_coalesced", "Decisions that joined a run already in flight"
+)
+decision_queue_depth = Gauge(
+    "decision_queue_depth",
+    "Graph runs waiting for one of the MAX_INFLIGHT slots",
+    multiprocess_mode="livesum",
+)
+llm_tokens_total = Counter(
+    "llm_tokens", "LLM tokens used, by direction", ["direction"]
+)
+
+
+class LLMUsageCallback(BaseCallbackHandler):
+    """Callback handler that counts LLM tokens in llm_tokens and logs prompt cache hits."""
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Record token usage and log cached input tokens from the LLM response."""
+        try:
+            message = response.generations[0][0].message
+        except (IndexError, TypeError, AttributeError):
+            return
+
+        usage_metadata = getattr(message, "usage_metadata", None)
+        if usage_metadata:
+            llm_tokens_total.labels(direction="in").inc(usage_metadata.get("input_tokens", 0))
+            llm_tokens_total.labels(direction="out").inc(usage_metadata.get("output_tokens", 0))
+            cached_tokens = usage_metadata.get("input_token_details", {}).get("cache_read", 0)
+            logger.info(
+                "LLM call used %d input tokens, %d from prompt cache",
+                usage_metadata.get("input_tokens", 0),
+                cached_tokens,
+            )
+
+
+# Response cache settings
+# Decisions for past dates never change, so they can be kept for a long time;
+# today's analysis may still move with intraday data and news.
+# Without REDIS_URL the cache lives in process memory, bounded by
+# LOCAL_CACHE_MAXSIZE entries of at most LOCAL_CACHE_TTL seconds each, and
+# batch jobs get a separate store of the same size so decisions cannot
+# evict them. Either way it is private to the process, which is why
+# gunicorn.conf.py only runs several workers when REDIS_URL is set.
+REDIS_URL = os.getenv("REDIS_URL")
+LOCAL_CACHE_MAXSIZE = int(os.getenv("LOCAL_CACHE_MAXSIZE", "512"))
+LOCAL_CACHE_TTL = int(os.getenv("LOCAL_CACHE_TTL", "3600"))
+CACHE_PREFIX = "ta"
+PAST_DECISION_TTL = 30 * 24 * 60 * 60
+TODAY_DECISION_TTL = 300
+# Quotes younger than STOCK_FRESH_TTL are served as is; older ones, up to
+# STOCK_STALE_TTL, are served immediately while a refresh runs in the background
+STOCK_FRESH_TTL = 10
+STOCK_STALE_TTL = 120
+STOCK_LOOKBACK_DAYS = 10
+BATCH_JOB_TTL = 24 * 60 * 60
+
+# Maximum number of decisions a batch request runs at the same time
+OPENAI_MAX_CONCURRENCY = int(os.getenv("OPENAI_MAX_CONCURRENCY", "4"))
+
+# Maximum number of items in one batch request; each item counts as one
+# request against DECISION_RATE_LIMIT, so it may not exceed that limit
+MAX_BATCH_ITEMS = int(os.getenv("MAX_BATCH_ITEMS", "10"))
+
+# Maximum number of graph runs in flight per worker process, across all
+# endpoints. Keeps bursts from flooding the LLM API and exhausting memory.
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "8"))
+_inflight_semaphore = asyncio.Semaphore(MAX_INFLIGHT)
+
+# Per-client limit on requests that start graph runs, in limits notation,
+# shared by all decision endpoints. Counted in Redis when configured so the
+# limit holds across workers; if the store is unreachable or slower than
+# RATE_LIMIT_TIMEOUT seconds, requests are let through rather than failed.
+DECISION_RATE_LIMIT = parse_rate_limit(os.getenv("DECISION_RATE_LIMIT", "10/minute"))
+RATE_LIMIT_TIMEOUT = 0.5
+if MAX_BATCH_ITEMS > DECISION_RATE_LIMIT.amount:
+    raise ValueError(
+        f"MAX_BATCH_ITEMS ({MAX_BATCH_ITEMS}) must not exceed the "
+        f"DECISION_RATE_LIMIT amount ({DECISION_RATE_LIMIT})"
+    )
+
+# Background batch jobs that are still running
+_background_tasks = set()
+
+# Stock quote fetch currently in flight per symbol
+_stock_refreshes: Dict[str, "asyncio.Task[StockInfo]"] = {}
+
+# Graph run currently in flight per decision cache key; concurrent requests
+# for the same (symbol, date) await it instead of starting their own
+_inflight_decisions: Dict[str, "asyncio.Task[DecisionResponse]"] = {}
+
+# Prime OpenAI's prompt cache with one call per analyst at startup. Off by
+# default since the calls are billed; with Redis only the first worker to
+# start within WARMUP_PROMPT_CACHE_CLAIM_TTL seconds (about how long OpenAI
+# keeps a prefix cached) makes them, so it runs once per deployment.
+WARMUP_PROMPT_CACHE = os.getenv("TRADINGAGENTS_WARMUP_PROMPT_CACHE", "false").lower() in (
+    "1", "true", "yes"
+)
+WARMUP_PROMPT_CACHE_CLAIM_TTL = 10 * 60
+
+# Run one full analysis at startup so the first request does not pay for
+# cold clients. Off by default since it costs a complete LLM pipeline run.
+WARMUP_PROPAGATE = os.getenv("TRADINGAGENTS_WARMUP_PROPAGATE", "false").lower() in (
+    "1", "true", "yes"
+)
+WARMUP_SYMBOL = os.getenv("TRADINGAGENTS_WARMUP_SYMBOL", "AAPL")
+WARMUP_DATE = os.getenv("TRADINGAGENTS_WARMUP_DATE", "2024-01-02")
+
+
+class TTLCacheBackend(Backend):
+    """In-process fastapi-cache backend for deployments without Redis.
+
+    Entries are bounded by maxsize and never outlive ttl; a shorter expire
+    passed to set() is honored per entry.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
 
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return 0, None
+        value, expires_at = entry
+        remaining = expires_at - time.monotonic()
+        if remaining <= 0:
+            self._cache.pop(key, None)
+            return 0, None
+        return math.ceil(remaining), value
 
-def get_trading_graph() -> TradingAgentsGraph:
-    """Lazy initialization of TradingAgentsGraph."""
-    global trading_graph_instance
-    if trading_graph_instance is None:
-        trading_graph_instance = TradingAgentsGraph(debug=False, config=config)
-    return trading_graph_instance
+    async def get(self, key: str) -> Optional[bytes]:
+        _, value = await self.get_with_ttl(key)
+        return value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        self._cache[key] = (value, time.monotonic() + (expire or self._cache.ttl))
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            keys = [k for k in list(self._cache) if k.startswith(f"{namespace}:")]
+        elif key and key in self._cache:
+            keys = [key]
+        else:
+            keys = []
+        for k in keys:
+            self._cache.pop(k, None)
+        return len(keys)
+
+
+async def claim_prompt_cache_warm_up(redis: Optional[aioredis.Redis]) -> bool:
+    """Return whether this worker should warm the prompt cache for the deployment."""
+    if config.get("llm_provider", "").lower() != "openai":
+        return False
+    if redis is None:
+        # Without Redis there is a single worker (see gunicorn.conf.py)
+        return True
+    try:
+        return bool(await redis.set(
+            f"{CACHE_PREFIX}:warmup:prompt_cache",
+            "1",
+            nx=True,
+            ex=WARMUP_PROMPT_CACHE_CLAIM_TTL,
+        ))
+    except Exception as e:
+        logger.warning("Could not claim prompt cache warm-up, skipping it: %s", e)
+        return False
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Build the trading graph and the response cache once at startup."""
+    redis = aioredis.from_url(REDIS_URL) if REDIS_URL else None
+    if redis is not None:
+        FastAPICache.init(RedisBackend(redis), prefix=CACHE_PREFIX)
+        app.state.job_backend = FastAPICache.get_backend()
+    else:
+        FastAPICache.init(
+            TTLCacheBackend(LOCAL_CACHE_MAXSIZE, LOCAL_CACHE_TTL), prefix=CACHE_PREFIX
+        )
+        app.state.job_backend = TTLCacheBackend(LOCAL_CACHE_MAXSIZE, BATCH_JOB_TTL)
+
+    # Async storage so limit checks never block the event loop
+    if REDIS_URL:
+        rate_limit_storage = storage_from_string(
+            f"async+{REDIS_URL}",
+            implementation="redispy",
+            socket_connect_timeout=RATE_LIMIT_TIMEOUT,
+            socket_timeout=RATE_LIMIT_TIMEOUT,
+        )
+    else:
+        rate_limit_storage = storage_from_string("async+memory://")
+    app.state.rate_limiter = MovingWindowRateLimiter(rate_limit_storage)
+
+    # Graph construction and warm-up block, so keep them off the event loop
+    app.state.graph = await asyncio.to_thread(
+        TradingAgentsGraph, debug=False, config=config, callbacks=[LLMUsageCallback()]
+    )
+    if WARMUP_PROMPT_CACHE and await claim_prompt_cache_warm_up(redis):
+        # Prime the provider's prefix cache before the first real request
+        try:
+            await asyncio.to_thread(app.state.graph.warm_up_prompt_cache)
+        except Exception as e:
+            logger.warning("Prompt cache warm-up failed: %s", e)
+    if WARMUP_PROPAGATE:
+        try:
+            await asyncio.to_thread(app.state.graph.propagate, WARMUP_SYMBOL, WARMUP_DATE)
+        except Exception as e:
+            logger.warning("Warm-up propagation failed: %s", e)
+
+    yield
+
+    # Let unfinished batch jobs record that they failed before shutting down
+    for task in list(_background_tasks):
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+
+    if redis is not None:
+        await redis.aclose()
+
+
+@asynccontextmanager
+async def inflight_slot():
+    """Hold one of the MAX_INFLIGHT graph-run slots, counting time spent queued."""
+    with decision_queue_depth.track_inprogress():
+        await _inflight_semaphore.acquire()
+    try:
+        yield
+    finally:
+        _inflight_semaphore.release()
+
+
+def get_graph(request: Request) -> TradingAgentsGraph:
+    """Return the TradingAgentsGraph built at startup."""
+    return request.app.state.graph
+
+
+async def check_decision_rate_limit(request: Request, cost: int = 1) -> None:
+    """Charge cost requests to the client, with a 429 if it is over DECISION_RATE_LIMIT."""
+    # The limiter never admits more than the limit at once, so retrying is futile
+    if cost > DECISION_RATE_LIMIT.amount:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Request counts as {cost} decisions, more than {DECISION_RATE_LIMIT} allows",
+        )
+
+    rate_limiter = request.app.state.rate_limiter
+    client = request.client.host if request.client else "unknown"
+
+    async def check() -> Optional[int]:
+        """Count the request; return seconds until retry if it is over the limit."""
+        if await rate_limiter.hit(DECISION_RATE_LIMIT, "decision", client, cost=cost):
+            return None
+        stats = await rate_limiter.get_window_stats(DECISION_RATE_LIMIT, "decision", client)
+        return max(1, math.ceil(stats.reset_time - time.time()))
+
+    try:
+        retry_after = await asyncio.wait_for(check(), RATE_LIMIT_TIMEOUT)
+    except Exception as e:
+        logger.warning("Rate limit check failed, letting request through: %s", e)
+        return
+
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded: {DECISION_RATE_LIMIT}",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+
+async def limit_decision_requests(request: Request) -> None:
+    """Reject a client that is over DECISION_RATE_LIMIT with a 429."""
+    await check_decision_rate_limit(request)
+
+
+def get_job_backend(request: Request) -> Backend:
+    """Return the cache backend that holds background batch jobs."""
+    return request.app.state.job_backend
+
+
+def decision_cache_key(symbol: str, trade_date: str) -> str:
+    """Build the cache key for a (symbol, date) decision."""
+    digest = hashlib.sha256(f"{symbol.upper()}:{trade_date}".encode()).hexdigest()
+    return f"{FastAPICache.get_prefix()}:decision:{digest}"
+
+
+def decision_cache_ttl(trade_date: str) -> int:
+    """Return the cache TTL in seconds for a decision on trade_date."""
+    if date.fromisoformat(trade_date) < date.today():
+        return PAST_DECISION_TTL
+    return TODAY_DECISION_TTL
+
+
+def batch_job_cache_key(job_id: str) -> str:
+    """Build the cache key for a background batch job."""
+    return f"{FastAPICache.get_prefix()}:batch:{job_id}"
+
+
+def stock_cache_key(symbol: str) -> str:
+    """Build the cache key for a symbol's stock quote."""
+    return f"{FastAPICache.get_prefix()}:stock:{symbol}"
+
+
+async def cache_get(key: str, backend: Optional[Backend] = None) -> Optional[bytes]:
+    """Read a raw value from the cache backend, treating errors as a miss."""
+    try:
+        return await (backend or FastAPICache.get_backend()).get(key)
+    except Exception as e:
+        logger.warning("Cache read failed for %s: %s", key, e)
+        return None
+
+
+async def cache_set(
+    key: str, value: BaseModel, expire: int, backend: Optional[Backend] = None
+) -> None:
+    """Store a model as JSON in the cache backend, ignoring backend errors."""
+    try:
+        await (backend or FastAPICache.get_backend()).set(
+            key, value.model_dump_json(), expire=expire
+        )
+    except Exception as e:
+        logger.warning("Cache write failed for %s: %s", key, e)
+
+
+class DecisionGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that never compresses the decision event stream."""
+
+    async def __call__(self, scope, receive, send) -> None:
+        """Pass /api/decision/stream through untouched, gzip everything else."""
+        # Starlette releases before the text/event-stream exclusion would
+        # compress the stream, holding events back in the gzip buffer
+        if scope["type"] == "http" and scope["path"] == "/api/decision/stream":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
 
 
 # Create FastAPI app
@@ -51,13 +426,29 @@ app = FastAPI(
     title="TradingAgents API",
     description="Multi-Agents LLM Financial Trading Framework API",
     version="1.0.0",
+    lifespan=lifespan,
+)
+
+# Decision payloads are mostly agent report text and compress well
+app.add_middleware(DecisionGZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Per-endpoint request counts and latencies, plus the metrics defined above
+Instrumentator(excluded_handlers=["/metrics"]).instrument(app).expose(
+    app, endpoint="/metrics", tags=["Health"]
 )
 
 
 class DecisionRequest(BaseModel):
     """Request model for decision endpoint."""
     symbol: str = Field(..., description="Stock ticker symbol (e.g., NVDA, AAPL)")
-    date: str = Field(..., description="Analysis date in YYYY-MM-DD format")
+    date: datetime.date = Field(..., description="Analysis date in YYYY-MM-DD format")
+    fields: Optional[List[str]] = Field(
+        None,
+        description=(
+            'full_state keys to return (e.g. ["market_report"]), or ["*"] for the '
+            'whole state. Defaults to ["decision"], which returns no full_state.'
+        ),
+    )
 
 
 class StockInfo(BaseModel):
@@ -76,16 +467,53 @@ class StockInfo(BaseModel):
     timestamp: str
 
 
+class CachedStockInfo(BaseModel):
+    """Cache entry for a stock quote with the time it was fetched."""
+    info: StockInfo
+    fetched_at: float
+
+
 class DecisionResponse(BaseModel):
     """Response model for decision endpoint."""
     success: bool
     symbol: str
     date: str
-    decision: Optional[Dict[str, Any]] = None
+    decision: Optional[str] = None
     full_state: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
 
+class BatchDecisionRequest(BaseModel):
+    """Request model for batch decision endpoint."""
+    items: List[DecisionRequest] = Field(
+        ...,
+        min_length=1,
+        max_length=MAX_BATCH_ITEMS,
+        description="(symbol, date) pairs to analyze",
+    )
+    background: bool = Field(
+        False,
+        description=(
+            "Run as an in-process background job and poll "
+            "/api/decision/batch/jobs/{job_id} for results"
+        ),
+    )
+
+
+class BatchDecisionResponse(BaseModel):
+    """Response model for batch decision endpoint."""
+    items: List[DecisionResponse]
+
+
+class BatchJobResponse(BaseModel):
+    """Response model for background batch jobs."""
+    job_id: str
+    status: str
+    total: int
+    items: Optional[List[DecisionResponse]] = None
+    error: Optional[str] = None
+
+
 @app.get("/health", tags=["Health"])
 async def health_check():
     """
@@ -101,11 +529,344 @@ async def health_check():
     }
 
 
-@app.post("/api/decision", tags=["Trading"], response_model=DecisionResponse)
-async def get_trading_decision(request: DecisionRequest):
+async def run_decision(
+    symbol: str,
+    trade_date: str,
+    cache_key: str,
+    run: Callable[[], Awaitable[Tuple[Dict[str, Any], str]]],
+) -> DecisionResponse:
+    """
+    Run one (symbol, date) analysis and cache a successful result.
+
+    run performs the graph run itself and returns (final_state, decision);
+    it is called holding an in-flight slot, unless the cache was filled by
+    a run that finished just before this one started.
+    """
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        decision_cache_hit_total.inc()
+        return DecisionResponse.model_validate_json(cached)
+
+    decision_cache_miss_total.inc()
+    try:
+        # Run the analysis
+        async with inflight_slot():
+            with propagate_seconds.time():
+                final_state, decision = await run()
+    except Exception as e:
+        return DecisionResponse(
+            success=False,
+            symbol=symbol,
+            date=trade_date,
+            decision=None,
+            error=str(e)
+        )
+
+    response = DecisionResponse(
+        success=True,
+        symbol=symbol,
+        date=trade_date,
+        decision=decision,
+        full_state=final_state
+    )
+    await cache_set(cache_key, response, decision_cache_ttl(trade_date))
+    return response
+
+
+async def compute_decision(
+    graph: TradingAgentsGraph, symbol: str, trade_date: str, cache_key: str
+) -> DecisionResponse:
+    """Run the graph for one (symbol, date) and cache a successful result."""
+    return await run_decision(
+        symbol,
+        trade_date,
+        cache_key,
+        lambda: run_in_threadpool(graph.propagate, symbol, trade_date),
+    )
+
+
+def join_inflight_decision(
+    cache_key: str,
+) -> Optional["asyncio.Task[DecisionResponse]"]:
+    """Return the run in flight for cache_key, if any, counting the caller as coalesced."""
+    task = _inflight_decisions.get(cache_key)
+    if task is not None:
+        decision_coalesced_total.inc()
+    return task
+
+
+def start_inflight_decision(
+    cache_key: str, run: Awaitable[DecisionResponse]
+) -> "asyncio.Task[DecisionResponse]":
+    """Start run as the shared in-flight run for cache_key until it finishes."""
+    task = asyncio.ensure_future(run)
+    _inflight_decisions[cache_key] = task
+
+    def forget(done: "asyncio.Task[DecisionResponse]") -> None:
+        if _inflight_decisions.get(cache_key) is done:
+            del _inflight_decisions[cache_key]
+
+    task.add_done_callback(forget)
+    return task
+
+
+async def run_decision(
+    graph: TradingAgentsGraph, symbol: str, trade_date: str
+) -> DecisionResponse:
+    """
+    Run the analysis for one (symbol, date), serving repeats from the cache.
+
+    The blocking graph run is executed in the thread pool so that several
+    decisions can be in flight at once, at most MAX_INFLIGHT per worker.
+    Concurrent requests for the same (symbol, date) share a single run and
+    all receive its result, including a failure. Failures are reported in
+    the returned DecisionResponse rather than raised.
+    """
+    cache_key = decision_cache_key(symbol, trade_date)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        decision_cache_hit_total.inc()
+        return DecisionResponse.model_validate_json(cached)
+
+    task = join_inflight_decision(cache_key)
+    if task is None:
+        task = start_inflight_decision(
+            cache_key, compute_decision(graph, symbol, trade_date, cache_key)
+        )
+
+    # Shield the shared run so one caller disconnecting does not cancel it
+    # for everyone else waiting on it
+    return await asyncio.shield(task)
+
+
+def select_state_fields(
+    response: DecisionResponse, fields: Optional[List[str]]
+) -> DecisionResponse:
+    """
+    Keep only the full_state keys the client asked for.
+
+    "*" keeps the whole state. The decision is always returned at the top
+    level, so no fields (or just "decision") drops full_state entirely.
+    Unknown keys are ignored.
+    """
+    if response.full_state is None or (fields and "*" in fields):
+        return response
+    state_fields = [field for field in fields or [] if field != "decision"]
+    if not state_fields:
+        return response.model_copy(update={"full_state": None})
+    return response.model_copy(update={"full_state": {
+        field: response.full_state[field]
+        for field in state_fields
+        if field in response.full_state
+    }})
+
+
+def requested_fields(
+    request: DecisionRequest, include_full_state: bool
+) -> Optional[List[str]]:
+    """Return the state fields for a request; include_full_state means all of them."""
+    return ["*"] if include_full_state else request.fields
+
+
+def sse_event(event: str, data: Any) -> str:
+    """Format one server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {orjson.dumps(data, default=str).decode()}\n\n"
+
+
+async def stream_decision_run(
+    graph: TradingAgentsGraph,
+    symbol: str,
+    trade_date: str,
+    cache_key: str,
+    events: "asyncio.Queue[Optional[Tuple[str, Dict[str, Any]]]]",
+) -> DecisionResponse:
+    """
+    Run the graph for one (symbol, date) via astream, like compute_decision.
+
+    Each node's update, minus its messages and empty reports, is put on
+    events as it completes, followed by None once the run is over.
+    """
+
+    async def run() -> Tuple[Dict[str, Any], str]:
+        """Stream the graph run, passing node updates on to events."""
+        result = None
+        async for node_name, update in graph.astream(symbol, trade_date):
+            if node_name == "final_decision":
+                result = update["final_state"], update["decision"]
+                continue
+
+            # Analysts return an empty report alongside their tool calls
+            payload = {k: v for k, v in update.items() if k != "messages" and v != ""}
+            if payload:
+                events.put_nowait((node_name, payload))
+        if result is None:
+            raise RuntimeError("Analysis finished without a final decision")
+        return result
+
+    try:
+        return await run_decision(symbol, trade_date, cache_key, run)
+    finally:
+        events.put_nowait(None)
+
+
+async def stream_decision_events(
+    graph: TradingAgentsGraph,
+    symbol: str,
+    trade_date: str,
+    fields: Optional[List[str]] = None,
+) -> AsyncIterator[str]:
+    """
+    Yield server-sent events for one (symbol, date) analysis as it runs.
+
+    Each agent's report or debate update is sent as an event named after the
+    node once it completes; message-only updates from tool and cleanup nodes
+    are skipped. The run ends with a final_decision event carrying the
+    DecisionResponse with the requested state fields, or an error event if
+    the run failed.
+
+    The run is shared like those of /api/decision: a stream joining a run
+    already in flight for the same key only gets the final event, and
+    /api/decision or batch requests arriving during a stream await its
+    result. The run continues if the streaming client disconnects.
+    """
+    cache_key = decision_cache_key(symbol, trade_date)
+    cached = await cache_get(cache_key)
+    if cached is not None:
+        decision_cache_hit_total.inc()
+        response = DecisionResponse.model_validate_json(cached)
+        yield sse_event("final_decision", select_state_fields(response, fields).model_dump())
+        return
+
+    task = join_inflight_decision(cache_key)
+    if task is None:
+        events = asyncio.Queue()
+        task = start_inflight_decision(
+            cache_key, stream_decision_run(graph, symbol, trade_date, cache_key, events)
+        )
+        while (event := await events.get()) is not None:
+            yield sse_event(*event)
+
+    # Shield the shared run so this client disconnecting does not cancel it
+    # for everyone else waiting on it
+    response = await asyncio.shield(task)
+    event = "final_decision" if response.success else "error"
+    yield sse_event(event, select_state_fields(response, fields).model_dump())
+
+
+def fetch_stock_info(symbol: str) -> StockInfo:
+    """
+    Build a StockInfo from the latest daily bars of the configured stock vendor.
+
+    Uses the same get_stock_data tool the agents use, over the last
+    STOCK_LOOKBACK_DAYS days, so price and change reflect the most recent
+    close and the one before it.
+
+    Raises:
+        LookupError: If the vendor returned no bars for symbol, e.g. because
+            the symbol does not exist.
+    """
+    today = date.today()
+    stock_data = get_stock_data.invoke({
+        "symbol": symbol,
+        "start_date": (today - timedelta(days=STOCK_LOOKBACK_DAYS)).isoformat(),
+        # End date is exclusive for yfinance, so include today's bar
+        "end_date": (today + timedelta(days=1)).isoformat(),
+    })
+
+    # Both vendors return CSV; yfinance adds "#" header lines, Alpha Vantage
+    # lists the newest bar first. Unknown symbols come back as a plain
+    # "No data found ..." message, which parses to no usable bars.
+    try:
+        bars = pd.read_csv(StringIO(stock_data), comment="#")
+    except pd.errors.EmptyDataError:
+        bars = pd.DataFrame()
+    bars.columns = [str(column).lower() for column in bars.columns]
+    if bars.empty or "close" not in bars.columns:
+        raise LookupError(f"No stock data found for {symbol}")
+    bars = bars.sort_values(bars.columns[0])
+
+    info = StockInfo(symbol=symbol, timestamp=today.isoformat())
+
+    latest = bars.iloc[-1]
+    info.timestamp = str(latest[bars.columns[0]])
+    info.price = float(latest["close"])
+    if "volume" in bars.columns:
+        info.volume = str(int(latest["volume"]))
+    if len(bars) > 1:
+        previous_close = float(bars.iloc[-2]["close"])
+        info.change = round(info.price - previous_close, 2)
+        info.change_percent = round(info.change / previous_close * 100, 2)
+
+    return info
+
+
+async def run_decision_batch(
+    graph: TradingAgentsGraph, items: List[DecisionRequest]
+) -> List[DecisionResponse]:
+    """Run decisions for all items concurrently, bounded by OPENAI_MAX_CONCURRENCY."""
+    semaphore = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+
+    async def run_one(item: DecisionRequest) -> DecisionResponse:
+        async with semaphore:
+            return await run_decision(graph, item.symbol.upper(), item.date.isoformat())
+
+    return list(await asyncio.gather(*(run_one(item) for item in items)))
+
+
+async def run_batch_job(
+    graph: TradingAgentsGraph,
+    job: BatchJobResponse,
+    items: List[DecisionRequest],
+    backend: Backend,
+) -> None:
+    """
+    Run a background batch job and store its progress in the job backend.
+
+    The job moves from pending to running, then to completed or failed. A
+    job cancelled by server shutdown is stored as failed as well, so it does
+    not stay pending for the rest of its TTL.
+    """
+    cache_key = batch_job_cache_key(job.job_id)
+    job.status = "running"
+    await cache_set(cache_key, job, BATCH_JOB_TTL, backend)
+
+    try:
+        job.items = await run_decision_batch(graph, items)
+        job.status = "completed"
+    except asyncio.CancelledError:
+        job.status = "failed"
+        job.error = "Server shut down before the job completed"
+        await cache_set(cache_key, job, BATCH_JOB_TTL, backend)
+        raise
+    except Exception as e:
+        logger.warning("Batch job %s failed: %s", job.job_id, e)
+        job.status = "failed"
+        job.error = str(e)
+    await cache_set(cache_key, job, BATCH_JOB_TTL, backend)
+
+
+@app.post(
+    "/api/decision",
+    tags=["Trading"],
+    response_model=DecisionResponse,
+    dependencies=[Depends(limit_decision_requests)],
+)
+async def get_trading_decision(
+    request: DecisionRequest,
+    include_full_state: bool = Query(
+        False, description="Include the full agent state (all reports and debates)"
+    ),
+    graph: TradingAgentsGraph = Depends(get_graph),
+):
     """
     Get a trading decision for a stock symbol on a specific date.
 
+    Results are cached per (symbol, date): decisions for past dates are kept
+    for 30 days, decisions for today for 5 minutes. Only the decision is
+    returned by default; list state keys in fields to get those reports in
+    full_state, or set include_full_state (same as fields=["*"]) for all of
+    them.
+
     This endpoint runs the full TradingAgents analysis including:
     - Analyst Team Reports (Market, Social, News, Fundamentals)
     - Research Team Decision (Bull/Bear Debate)
@@ -114,60 +875,197 @@ async def get_trading_decision(request: DecisionRequest):
     - Portfolio Manager Final Decision
 
     Args:
-        request: DecisionRequest with symbol and date
+        request: DecisionRequest with symbol, date and optional fields
+        include_full_state: Whether to include the full agent state
 
     Returns:
         DecisionResponse with the trading decision and analysis
     """
-    try:
-        symbol = request.symbol.upper()
-        trade_date = request.date
+    symbol = request.symbol.upper()
+    trade_date = request.date.isoformat()
 
-        # Validate date format
-        try:
-            year, month, day = map(int, trade_date.split('-'))
-            date(year, month, day)
-        except ValueError:
-            raise HTTPException(
-                status_code=400,
-                detail="Invalid date format. Please use YYYY-MM-DD format."
-            )
+    response = await run_decision(graph, symbol, trade_date)
+    return select_state_fields(response, requested_fields(request, include_full_state))
 
-        # Get trading graph instance
-        graph = get_trading_graph()
 
-        # Run the analysis
-        final_state, decision = graph.propagate(symbol, trade_date)
+@app.post(
+    "/api/decision/stream",
+    tags=["Trading"],
+    dependencies=[Depends(limit_decision_requests)],
+)
+async def stream_trading_decision(
+    request: DecisionRequest,
+    graph: TradingAgentsGraph = Depends(get_graph),
+):
+    """
+    Stream a trading decision as server-sent events while the agents run.
 
-        return DecisionResponse(
-            success=True,
-            symbol=symbol,
-            date=trade_date,
-            decision=decision,
-            full_state=final_state
-        )
+    Runs the same analysis as /api/decision, but emits each agent's output as
+    soon as it completes instead of waiting for the whole pipeline. The last
+    event is final_decision with the DecisionResponse, with full_state
+    limited to the requested fields, or error if the run failed.
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        return DecisionResponse(
-            success=False,
-            symbol=request.symbol.upper() if hasattr(request, 'symbol') else "",
-            date=request.date if hasattr(request, 'date') else "",
-            decision=None,
-            error=str(e)
+    Args:
+        request: DecisionRequest with symbol, date and optional fields
+
+    Returns:
+        text/event-stream response
+    """
+    symbol = request.symbol.upper()
+    trade_date = request.date.isoformat()
+
+    return StreamingResponse(
+        stream_decision_events(graph, symbol, trade_date, request.fields),
+        media_type="text/event-stream",
+    )
+
+
+@app.post(
+    "/api/decision/batch",
+    tags=["Trading"],
+    response_model=Union[BatchDecisionResponse, BatchJobResponse],
+)
+async def get_trading_decision_batch(
+    request: BatchDecisionRequest,
+    http_request: Request,
+    response: Response,
+    include_full_state: bool = Query(
+        False, description="Include the full agent state (all reports and debates)"
+    ),
+    graph: TradingAgentsGraph = Depends(get_graph),
+    job_backend: Backend = Depends(get_job_backend),
+):
+    """
+    Get trading decisions for several (symbol, date) pairs in one call.
+
+    Items are analyzed concurrently, at most OPENAI_MAX_CONCURRENCY at a
+    time, and each one goes through the same cache as /api/decision. Each
+    item's fields select its full_state keys, as for /api/decision.
+
+    With background set, the batch runs as a background job in this process
+    instead, with the same pipeline and cost: the endpoint returns 202 with a
+    job id right away, and the results can be fetched from
+    /api/decision/batch/jobs/{job_id}. A batch holds at most
+    MAX_BATCH_ITEMS items, and each item counts as one request against
+    DECISION_RATE_LIMIT. Job results only honor include_full_state, since
+    they are fetched in a later request.
+
+    Args:
+        request: BatchDecisionRequest with the items to analyze
+        http_request: The incoming request, used to identify the client
+        include_full_state: Whether to include the full agent state per item
+
+    Returns:
+        BatchDecisionResponse with one DecisionResponse per item, in order,
+        or a pending BatchJobResponse when background is set
+    """
+    # Every item may start a graph run, so the batch is charged per item
+    await check_decision_rate_limit(http_request, cost=len(request.items))
+
+    if not request.background:
+        items = await run_decision_batch(graph, request.items)
+        return BatchDecisionResponse(
+            items=[
+                select_state_fields(item, requested_fields(item_request, include_full_state))
+                for item, item_request in zip(items, request.items)
+            ]
         )
 
+    job = BatchJobResponse(
+        job_id=uuid.uuid4().hex,
+        status="pending",
+        total=len(request.items),
+    )
+    await cache_set(batch_job_cache_key(job.job_id), job, BATCH_JOB_TTL, job_backend)
+
+    # Keep a reference so the task is not garbage collected while running
+    task = asyncio.create_task(
+        run_batch_job(graph, job, request.items, job_backend)
+    )
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+    response.status_code = 202
+    return job
+
+
+@app.get(
+    "/api/decision/batch/jobs/{job_id}",
+    tags=["Trading"],
+    response_model=BatchJobResponse,
+)
+async def get_batch_job(
+    job_id: str,
+    include_full_state: bool = Query(
+        False, description="Include the full agent state (all reports and debates)"
+    ),
+    job_backend: Backend = Depends(get_job_backend),
+):
+    """
+    Get the status and, once completed, the results of a batch job.
+
+    Args:
+        job_id: Job id returned by /api/decision/batch
+        include_full_state: Whether to include the full agent state per item
+
+    Returns:
+        BatchJobResponse for the job
+    """
+    cached = await cache_get(batch_job_cache_key(job_id), job_backend)
+    if cached is None:
+        raise HTTPException(status_code=404, detail=f"Batch job {job_id} not found")
+
+    job = BatchJobResponse.model_validate_json(cached)
+    if job.items is not None:
+        fields = ["*"] if include_full_state else None
+        job.items = [select_state_fields(item, fields) for item in job.items]
+    return job
+
+
+async def refresh_stock_info(symbol: str) -> StockInfo:
+    """Fetch a fresh quote for symbol and store it in the cache."""
+    info = await run_in_threadpool(fetch_stock_info, symbol)
+    await cache_set(
+        stock_cache_key(symbol),
+        CachedStockInfo(info=info, fetched_at=time.time()),
+        STOCK_STALE_TTL,
+    )
+    return info
+
+
+def start_stock_refresh(symbol: str) -> "asyncio.Task[StockInfo]":
+    """Return the quote fetch in flight for symbol, starting one if needed."""
+    task = _stock_refreshes.get(symbol)
+    if task is not None:
+        return task
+
+    task = asyncio.create_task(refresh_stock_info(symbol))
+    _stock_refreshes[symbol] = task
+
+    def finish(done: "asyncio.Task[StockInfo]") -> None:
+        if _stock_refreshes.get(symbol) is done:
+            del _stock_refreshes[symbol]
+        if not done.cancelled() and done.exception() is not None:
+            logger.warning("Stock refresh for %s failed: %s", symbol, done.exception())
+
+    task.add_done_callback(finish)
+    return task
+
 
 @app.get("/api/stock", tags=["Stock Data"], response_model=StockInfo)
 async def get_stock_info(
-    symbol: str = Query(..., description="Stock ticker symbol (e.g., NVDA, AAPL)")
+    response: Response,
+    symbol: str = Query(..., description="Stock ticker symbol (e.g., NVDA, AAPL)"),
 ):
     """
     Get basic stock information for a symbol.
 
     This endpoint provides quick access to stock data without running
-    the full analysis pipeline.
+    the full analysis pipeline. Quotes are served from the cache while they
+    are under 10 seconds old. Quotes up to 2 minutes old are served right
+    away and refreshed in the background. The X-Cache response header is
+    HIT, STALE or MISS accordingly. Symbols without data return 404 and are
+    not cached.
 
     Args:
         symbol: Stock ticker symbol
@@ -175,47 +1073,28 @@ async def get_stock_info(
     Returns:
         StockInfo with basic stock data
     """
-    try:
-        symbol = symbol.upper()
-
-        # Try to import get_stock_data from the agents
-        try:
-            from tradingagents.agents.utils.agent_utils import get_stock_data
-            from tradingagents.dataflows.config import set_config
-            from tradingagents.default_config import DEFAULT_CONFIG
-
-            # Set up config for the tool
-            set_config(DEFAULT_CONFIG)
-
-            # Get stock data using the same tool the agents use
-            stock_data = get_stock_data(symbol)
+    symbol = symbol.upper()
 
-            # Parse the stock data
-            info = StockInfo(symbol=symbol)
-
-            if isinstance(stock_data, dict):
-                info.price = stock_data.get('current_price')
-                info.change = stock_data.get('change')
-                info.change_percent = stock_data.get('change_percent')
-                info.market_cap = stock_data.get('market_cap')
-                info.volume = stock_data.get('volume')
-                info.pe_ratio = stock_data.get('pe_ratio')
-                info.dividend_yield = stock_data.get('dividend_yield')
-                info.fifty_two_week_high = stock_data.get('fifty_two_week_high')
-                info.fifty_two_week_low = stock_data.get('fifty_two_week_low')
-                info.name = stock_data.get('company_name') or stock_data.get('name')
-
-            return info
-
-        except Exception as e:
-            # If the tool is not available, return minimal info
-            return StockInfo(
-                symbol=symbol,
-                error=f"Could not fetch stock data: {str(e)}"
-            )
+    cached = await cache_get(stock_cache_key(symbol))
+    if cached is not None:
+        entry = CachedStockInfo.model_validate_json(cached)
+        if time.time() - entry.fetched_at < STOCK_FRESH_TTL:
+            response.headers["X-Cache"] = "HIT"
+        else:
+            response.headers["X-Cache"] = "STALE"
+            start_stock_refresh(symbol)
+        return entry.info
 
+    response.headers["X-Cache"] = "MISS"
+    try:
+        # Shield the shared fetch so one caller disconnecting does not cancel it
+        return await asyncio.shield(start_stock_refresh(symbol))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(
+            status_code=502, detail=f"Could not fetch stock data: {str(e)}"
+        )
 
 
 @app.get("/", tags=["Info"])
@@ -230,16 +1109,15 @@ async def root():
         "endpoints": {
             "health": "/health",
             "decision": "/api/decision (POST)",
-            "stock": "/api/stock (GET)"
+            "decision_stream": "/api/decision/stream (POST)",
+            "decision_batch": "/api/decision/batch (POST)",
+            "decision_batch_job": "/api/decision/batch/jobs/{job_id} (GET)",
+            "stock": "/api/stock (GET)",
+            "metrics": "/metrics (GET)"
         }
     }
 
 
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "http_server:app",
-        host="0.0.0.0",
-        port=11360,
-        reload=False
-    )
+    # Serve with Gunicorn managing uvicorn worker processes, see gunicorn.conf.py
+    os.execvp("gunicorn", ["gunicorn", "http_server:app", "--config", "gunicorn.conf.py"])
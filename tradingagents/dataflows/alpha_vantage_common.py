@@ -4,9 +4,15 @@ import pandas as pd
 import json
 from datetime import datetime
 from io import StringIO
+from requests.adapters import HTTPAdapter
 
 API_BASE_URL = "https://www.alphavantage.co/query"
 
+# Shared session so repeated calls reuse keep-alive connections instead of
+# paying a TCP + TLS handshake per request. Sized for concurrent graph runs.
+_session = requests.Session()
+_session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=32))
+
 def get_api_key() -> str:
     """Retrieve the API key for Alpha Vantage from environment variables."""
     api_key = os.getenv("ALPHA_VANTAGE_API_KEY")
@@ -63,7 +69,7 @@ def _make_api_request(function_name: str, params: dict) -> dict | str:
         # Remove entitlement if it's None or empty
         api_params.pop("entitlement", None)
     
-    response = requests.get(API_BASE_URL, params=api_params)
+    response = _session.get(API_BASE_URL, params=api_params)
     response.raise_for_status()
 
     response_text = response.text
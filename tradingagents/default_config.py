@@ -15,6 +15,13 @@ DEFAULT_CONFIG = {
     # Provider-specific thinking configuration
     "google_thinking_level": None,      # "high", "minimal", etc.
     "openai_reasoning_effort": None,    # "medium", "high", "low"
+    # Prompt caching (OpenAI): route calls with a shared prompt prefix to the same cache
+    "enable_prompt_caching": False,
+    "prompt_cache_key": "tradingagents",
+    # Token budget per minute shared by all LLM calls of a graph (None = unlimited)
+    "llm_tokens_per_minute": None,
+    # Redis URL to share that budget between processes (None = per graph)
+    "llm_rate_limit_redis_url": None,
     # Debate and discussion settings
     "max_debate_rounds": 1,
     "max_risk_discuss_rounds": 1,
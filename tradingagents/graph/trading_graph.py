@@ -1,6 +1,7 @@
 # TradingAgents/graph/trading_graph.py
 
 import os
+import asyncio
 from pathlib import Path
 import json
 from datetime import date
@@ -8,7 +9,11 @@ from typing import Dict, Any, Tuple, List, Optional
 
 from langgraph.prebuilt import ToolNode
 
-from tradingagents.llm_clients import create_llm_client
+from tradingagents.llm_clients import (
+    RedisTokenBudgetRateLimiter,
+    TokenBudgetRateLimiter,
+    create_llm_client,
+)
 
 from tradingagents.agents import *
 from tradingagents.default_config import DEFAULT_CONFIG
@@ -59,6 +64,7 @@ class TradingAgentsGraph:
             callbacks: Optional list of callback handlers (e.g., for tracking LLM/tool stats)
         """
         self.debug = debug
+        self.selected_analysts = selected_analysts
         self.config = config or DEFAULT_CONFIG
         self.callbacks = callbacks or []
 
@@ -75,8 +81,27 @@ class TradingAgentsGraph:
         llm_kwargs = self._get_provider_kwargs()
 
         # Add callbacks to kwargs if provided (passed to LLM constructor)
-        if self.callbacks:
-            llm_kwargs["callbacks"] = self.callbacks
+        llm_callbacks = list(self.callbacks)
+
+        # Hold LLM calls back once the token budget for the last minute is
+        # spent; the limiter learns each response's usage as a callback.
+        # With a Redis URL the budget is shared by every process using it.
+        tokens_per_minute = self.config.get("llm_tokens_per_minute")
+        rate_limit_redis_url = self.config.get("llm_rate_limit_redis_url")
+        if not tokens_per_minute:
+            self.rate_limiter = None
+        elif rate_limit_redis_url:
+            self.rate_limiter = RedisTokenBudgetRateLimiter(
+                tokens_per_minute, rate_limit_redis_url
+            )
+        else:
+            self.rate_limiter = TokenBudgetRateLimiter(tokens_per_minute)
+        if self.rate_limiter is not None:
+            llm_kwargs["rate_limiter"] = self.rate_limiter
+            llm_callbacks.append(self.rate_limiter)
+
+        if llm_callbacks:
+            llm_kwargs["callbacks"] = llm_callbacks
 
         deep_client = create_llm_client(
             provider=self.config["llm_provider"],
@@ -122,10 +147,11 @@ class TradingAgentsGraph:
         self.reflector = Reflector(self.quick_thinking_llm)
         self.signal_processor = SignalProcessor(self.quick_thinking_llm)
 
-        # State tracking
+        # State tracking. The compiled graph is shared, so propagate() may be
+        # called from several threads at once; everything a run needs is kept
+        # per call and these only record the most recent run.
         self.curr_state = None
         self.ticker = None
-        self.log_states_dict = {}  # date to full state dict
 
         # Set up the graph
         self.graph = self.graph_setup.setup_graph(selected_analysts)
@@ -144,6 +170,8 @@ class TradingAgentsGraph:
             reasoning_effort = self.config.get("openai_reasoning_effort")
             if reasoning_effort:
                 kwargs["reasoning_effort"] = reasoning_effort
+            if self.config.get("enable_prompt_caching"):
+                kwargs["prompt_cache_key"] = self.config.get("prompt_cache_key", "tradingagents")
 
         return kwargs
 
@@ -183,16 +211,59 @@ class TradingAgentsGraph:
             ),
         }
 
-    def propagate(self, company_name, trade_date):
-        """Run the trading agents graph for a company on a specific date."""
+    def warm_up_prompt_cache(self, company_name="SPY", trade_date=None):
+        """Prime the provider's prompt cache with each analyst's shared prefix.
+
+        Analyst prompts start with the tool schemas and system instructions and
+        end with the ticker and date, so a single call per analyst with a
+        placeholder ticker caches the prefix that later runs reuse.
+
+        Only OpenAI calls carry a prompt_cache_key, so for other providers
+        this returns False without making any calls; otherwise it returns True.
+        """
+        if not (
+            self.config.get("enable_prompt_caching")
+            and self.config.get("llm_provider", "").lower() == "openai"
+        ):
+            return False
+
+        analyst_factories = {
+            "market": create_market_analyst,
+            "social": create_social_media_analyst,
+            "news": create_news_analyst,
+            "fundamentals": create_fundamentals_analyst,
+        }
+        init_agent_state = self.propagator.create_initial_state(
+            company_name, trade_date or date.today().isoformat()
+        )
+        for analyst_type in self.selected_analysts:
+            analyst_factories[analyst_type](self.quick_thinking_llm)(init_agent_state)
+        return True
 
+    def _start_run(self, company_name, trade_date):
+        """Return the initial state and graph args for a run."""
         self.ticker = company_name
 
         # Initialize state
         init_agent_state = self.propagator.create_initial_state(
             company_name, trade_date
         )
-        args = self.propagator.get_graph_args()
+        return init_agent_state, self.propagator.get_graph_args()
+
+    def _finish_run(self, trade_date, final_state):
+        """Store and log a run's final state, and return its processed signal."""
+        # Store current state for reflection
+        self.curr_state = final_state
+
+        # Log state
+        self._log_state(trade_date, final_state)
+
+        return self.process_signal(final_state["final_trade_decision"])
+
+    def propagate(self, company_name, trade_date):
+        """Run the trading agents graph for a company on a specific date."""
+
+        init_agent_state, args = self._start_run(company_name, trade_date)
 
         if self.debug:
             # Debug mode with tracing
@@ -209,18 +280,37 @@ class TradingAgentsGraph:
             # Standard mode without tracing
             final_state = self.graph.invoke(init_agent_state, **args)
 
-        # Store current state for reflection
-        self.curr_state = final_state
+        # Return decision and processed signal
+        return final_state, self._finish_run(trade_date, final_state)
 
-        # Log state
-        self._log_state(trade_date, final_state)
+    async def astream(self, company_name, trade_date):
+        """Run the trading agents graph, yielding each node's output as it completes.
 
-        # Return decision and processed signal
-        return final_state, self.process_signal(final_state["final_trade_decision"])
+        Yields (node_name, update) tuples, where update is the partial state the
+        node returned. The last tuple is ("final_decision", {"final_state": ...,
+        "decision": ...}) with the same values propagate() returns.
+        """
+
+        init_agent_state, args = self._start_run(company_name, trade_date)
+
+        final_state = None
+        async for mode, chunk in self.graph.astream(
+            init_agent_state, stream_mode=["updates", "values"], config=args["config"]
+        ):
+            if mode == "values":
+                final_state = chunk
+            else:
+                for node_name, update in chunk.items():
+                    yield node_name, update or {}
+
+        # Logging and signal processing block, so keep them off the event loop
+        decision = await asyncio.to_thread(self._finish_run, trade_date, final_state)
+        yield "final_decision", {"final_state": final_state, "decision": decision}
 
     def _log_state(self, trade_date, final_state):
         """Log the final state to a JSON file."""
-        self.log_states_dict[str(trade_date)] = {
+        ticker = final_state["company_of_interest"]
+        state_log = {
             "company_of_interest": final_state["company_of_interest"],
             "trade_date": final_state["trade_date"],
             "market_report": final_state["market_report"],
@@ -251,14 +341,16 @@ class TradingAgentsGraph:
         }
 
         # Save to file
-        directory = Path(f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/")
+        directory = Path(f"eval_results/{ticker}/TradingAgentsStrategy_logs/")
         directory.mkdir(parents=True, exist_ok=True)
 
+        # Only this run's state goes in its (ticker, date) file, so runs for
+        # other tickers or dates never leak into it
         with open(
-            f"eval_results/{self.ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
+            f"eval_results/{ticker}/TradingAgentsStrategy_logs/full_states_log_{trade_date}.json",
             "w",
         ) as f:
-            json.dump(self.log_states_dict, f, indent=4)
+            json.dump({str(trade_date): state_log}, f, indent=4)
 
     def reflect_and_remember(self, returns_losses):
         """Reflect on decisions and update memory based on returns."""
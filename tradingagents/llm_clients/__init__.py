@@ -1,4 +1,10 @@
 from .base_client import BaseLLMClient
 from .factory import create_llm_client
+from .rate_limiter import RedisTokenBudgetRateLimiter, TokenBudgetRateLimiter
 
-__all__ = ["BaseLLMClient", "create_llm_client"]
+__all__ = [
+    "BaseLLMClient",
+    "create_llm_client",
+    "RedisTokenBudgetRateLimiter",
+    "TokenBudgetRateLimiter",
+]
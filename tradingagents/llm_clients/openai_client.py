@@ -61,10 +61,15 @@ class OpenAIClient(BaseLLMClient):
         elif self.base_url:
             llm_kwargs["base_url"] = self.base_url
 
-        for key in ("timeout", "max_retries", "reasoning_effort", "api_key", "callbacks"):
+        for key in ("timeout", "max_retries", "reasoning_effort", "api_key", "callbacks", "rate_limiter"):
             if key in self.kwargs:
                 llm_kwargs[key] = self.kwargs[key]
 
+        # Sent with every request so calls sharing a prefix hit the same prompt cache.
+        # Passed in the request body, since older openai SDKs reject it as an argument.
+        if "prompt_cache_key" in self.kwargs:
+            llm_kwargs["extra_body"] = {"prompt_cache_key": self.kwargs["prompt_cache_key"]}
+
         return UnifiedChatOpenAI(**llm_kwargs)
 
     def validate_model(self) -> bool:
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import redis
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.rate_limiters import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBudgetRateLimiter(BaseRateLimiter, BaseCallbackHandler):
+    """Rate limiter that keeps LLM token usage under a per-minute budget.
+
+    Pass the same instance as the chat model's rate_limiter and as one of its
+    callbacks: the callback records the tokens each response used, and new
+    calls wait while the tokens used over the last window reach the budget.
+    Usage is only known once a response arrives, so calls already in flight
+    can overshoot the budget briefly.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        window_seconds: float = 60.0,
+        check_every_n_seconds: float = 0.5,
+    ):
+        self.tokens_per_minute = tokens_per_minute
+        self.window_seconds = window_seconds
+        self.check_every_n_seconds = check_every_n_seconds
+        self._usage = deque()  # (timestamp, tokens) per response
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def _wait_time(self) -> float:
+        """Return how long to wait before the budget allows another call."""
+        with self._lock:
+            now = time.monotonic()
+            while self._usage and now - self._usage[0][0] >= self.window_seconds:
+                self._used -= self._usage.popleft()[1]
+            if self._used < self.tokens_per_minute:
+                return 0.0
+            # Wait until the oldest response leaves the window
+            return max(self._usage[0][0] + self.window_seconds - now, self.check_every_n_seconds)
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        wait = self._wait_time()
+        while wait > 0:
+            if not blocking:
+                return False
+            time.sleep(min(wait, self.check_every_n_seconds))
+            wait = self._wait_time()
+        return True
+
+    async def _await_wait_time(self) -> float:
+        """Return _wait_time() from async code; in-memory checks do not block."""
+        return self._wait_time()
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        wait = await self._await_wait_time()
+        while wait > 0:
+            if not blocking:
+                return False
+            await asyncio.sleep(min(wait, self.check_every_n_seconds))
+            wait = await self._await_wait_time()
+        return True
+
+    def record_usage(self, tokens: int) -> None:
+        """Count tokens used by a response against the budget."""
+        if tokens <= 0:
+            return
+        with self._lock:
+            self._usage.append((time.monotonic(), tokens))
+            self._used += tokens
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Record the total tokens reported in the response usage."""
+        try:
+            message = response.generations[0][0].message
+        except (IndexError, TypeError, AttributeError):
+            return
+
+        usage_metadata = getattr(message, "usage_metadata", None)
+        if usage_metadata:
+            self.record_usage(usage_metadata.get("total_tokens", 0))
+
+
+class RedisTokenBudgetRateLimiter(TokenBudgetRateLimiter):
+    """TokenBudgetRateLimiter whose usage window is kept in Redis.
+
+    Every process using the same Redis and key_prefix shares one budget, so
+    it can stand for a provider's account-wide tokens-per-minute quota.
+    Usage is counted in fixed windows, with the previous window weighted by
+    how much of it still overlaps the last window_seconds. If Redis cannot
+    be reached, calls are let through rather than held back.
+    """
+
+    def __init__(
+        self,
+        tokens_per_minute: int,
+        redis_url: str,
+        key_prefix: str = "tradingagents:llm_tokens",
+        window_seconds: float = 60.0,
+        check_every_n_seconds: float = 0.5,
+    ):
+        super().__init__(tokens_per_minute, window_seconds, check_every_n_seconds)
+        self.key_prefix = key_prefix
+        self._redis = redis.Redis.from_url(
+            redis_url, socket_timeout=1, socket_connect_timeout=1
+        )
+
+    def _window_key(self, index: int) -> str:
+        return f"{self.key_prefix}:{index}"
+
+    def _wait_time(self) -> float:
+        """Return how long to wait before the shared budget allows another call."""
+        # Wall-clock time, since the windows are shared between hosts
+        index, offset = divmod(time.time(), self.window_seconds)
+        index = int(index)
+        try:
+            previous, current = self._redis.mget(
+                self._window_key(index - 1), self._window_key(index)
+            )
+        except redis.RedisError as e:
+            logger.warning("Token budget check failed, not limiting: %s", e)
+            return 0.0
+
+        overlap = 1 - offset / self.window_seconds
+        used = int(previous or 0) * overlap + int(current or 0)
+        if used < self.tokens_per_minute:
+            return 0.0
+        return self.check_every_n_seconds
+
+    async def _await_wait_time(self) -> float:
+        """Run the Redis check in a thread so it does not block the event loop."""
+        return await asyncio.to_thread(self._wait_time)
+
+    def record_usage(self, tokens: int) -> None:
+        """Add tokens used by a response to the current shared window."""
+        if tokens <= 0:
+            return
+        key = self._window_key(int(time.time() // self.window_seconds))
+        try:
+            pipeline = self._redis.pipeline()
+            pipeline.incrby(key, tokens)
+            # Keep the window while it can still be the previous one
+            pipeline.expire(key, int(self.window_seconds * 2) + 1)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.warning("Could not record %d LLM tokens: %s", tokens, e)
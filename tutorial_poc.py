@@ -12,17 +12,26 @@ Usage:
 import requests
 import json
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration
 BASE_URL = "http://localhost:11360"
 
+# Number of decisions requested at the same time in test_batch_decisions
+MAX_WORKERS = 8
+
+# Reuse one keep-alive connection pool for all requests to the server, with
+# a connection for each concurrent worker
+SESSION = requests.Session()
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
 def test_health_check():
     """Test the health endpoint"""
     print("=" * 60)
     print("Testing Health Check")
     print("=" * 60)
     try:
-        response = requests.get(f"{BASE_URL}/health", timeout=10)
+        response = SESSION.get(f"{BASE_URL}/health", timeout=10)
         print(f"Status: {response.status_code}")
         print(f"Response: {response.json()}")
         return True
@@ -45,11 +54,10 @@ def test_get_stock_info():
     stock_symbol = "NVDA"
     print(f"Requesting information for {stock_symbol}...")
 
-    # Note: The actual endpoint depends on the TradingAgents API
-    # This is a placeholder showing how to structure the request
     try:
-        response = requests.get(
-            f"{BASE_URL}/api/stock/{stock_symbol}",
+        response = SESSION.get(
+            f"{BASE_URL}/api/stock",
+            params={"symbol": stock_symbol},
             timeout=30
         )
         print(f"Status: {response.status_code}")
@@ -76,15 +84,23 @@ def test_trading_decision():
     print(f"Requesting trading decision for {stock_symbol} on {period}...")
 
     try:
-        # POST request with stock symbol and date
-        response = requests.post(
+        # POST request with stock symbol and date, including the agent reports
+        response = SESSION.post(
             f"{BASE_URL}/api/decision",
+            params={"include_full_state": "true"},
             json={"symbol": stock_symbol, "date": period},
             timeout=60
         )
         print(f"Status: {response.status_code}")
         if response.status_code == 200:
-            print(f"Response: {json.dumps(response.json(), indent=2)}")
+            # The full agent state can be hundreds of KB, so only report its
+            # size instead of pretty-printing it
+            result = response.json()
+            full_state = result.pop("full_state", None)
+            print(f"Response: {json.dumps(result, indent=2)}")
+            if full_state is not None:
+                print(f"Full state: {len(full_state)} fields, "
+                      f"{len(json.dumps(full_state))} bytes")
         else:
             print(f"Error: {response.text}")
         return True
@@ -95,6 +111,42 @@ def test_trading_decision():
         print(f"ERROR: {e}")
         return False
 
+def test_batch_decisions(symbols, date):
+    """Test requesting trading decisions for several symbols in parallel"""
+    print("\n" + "=" * 60)
+    print("Testing Parallel Trading Decisions")
+    print("=" * 60)
+    print(f"Requesting trading decisions for {', '.join(symbols)} on {date}...")
+
+    def request_decision(symbol):
+        return SESSION.post(
+            f"{BASE_URL}/api/decision",
+            json={"symbol": symbol, "date": date},
+            timeout=600
+        )
+
+    # The server runs several analyses at once, so send the requests
+    # concurrently instead of waiting for each one in turn. For many
+    # symbols, /api/decision/batch does the same in a single request, or
+    # with "background": true returns a job id to poll for the results.
+    try:
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            responses = list(executor.map(request_decision, symbols))
+        print(f"Completed {len(responses)} requests in {time.time() - start:.1f}s")
+        for symbol, response in zip(symbols, responses):
+            if response.status_code == 200:
+                print(f"{symbol}: {response.json().get('decision')}")
+            else:
+                print(f"{symbol}: Error {response.status_code}: {response.text}")
+        return True
+    except requests.exceptions.ConnectionError:
+        print("ERROR: Could not connect to TradingAgents server.")
+        return False
+    except Exception as e:
+        print(f"ERROR: {e}")
+        return False
+
 def main():
     """Main function to run all tests"""
     print("TradingAgents Docker Container API Tutorial/PoC")
@@ -117,6 +169,7 @@ def main():
     # Run other tests
     test_get_stock_info()
     test_trading_decision()
+    test_batch_decisions(["NVDA", "AAPL", "MSFT"], "2024-05-10")
 
     print("\n" + "=" * 60)
     print("Tutorial Complete")